@@ -1,35 +1,61 @@
-import random
 import numpy as np
 
 # -----------------------------
 # Rule-Based Stress Engine
 # -----------------------------
 
-def compute_risk(student):
-    risk = 0
-    reasons = []
+# Trigger bits set by compute_risk, one per rule
+ATTENDANCE_BIT = 1 << 0
+LATE_BIT = 1 << 1
+WORKLOAD_BIT = 1 << 2
+MISSING_BIT = 1 << 3
+DROP_BIT = 1 << 4
+
+REC_MAP = {
+    ATTENDANCE_BIT: "Schedule advisor check-in",
+    LATE_BIT: "Adopt weekly workload planning",
+    WORKLOAD_BIT: "Rebalance academic schedule",
+    MISSING_BIT: "Immediate academic follow-up",
+}
+
+REASONS = (
+    "Attendance below 75% in last 2 weeks",
+    "Multiple late assignment submissions",
+    "Sudden workload spike (>40%)",
+    "Missing assignment submission",
+    "Sharp attendance drop vs previous period",
+)
+
 
-    if student["attendance_2w"] < 75:
-        risk += 20
-        reasons.append("Attendance below 75% in last 2 weeks")
+def _attendance_points(attendance_2w):
+    return 20 * bool(attendance_2w < 75)
 
-    if student["late_submissions"] >= 2:
-        risk += 25
-        reasons.append("Multiple late assignment submissions")
 
-    if student["workload_spike_pct"] > 40:
-        risk += 15
-        reasons.append("Sudden workload spike (>40%)")
+def _workload_points(workload_spike_pct):
+    return 15 * bool(workload_spike_pct > 40)
 
-    if student["missing_assignment"]:
-        risk += 25
-        reasons.append("Missing assignment submission")
 
-    if student["attendance_drop"] > 20:
-        risk += 15
-        reasons.append("Sharp attendance drop vs previous period")
+def _drop_points(attendance_drop):
+    return 15 * bool(attendance_drop > 20)
 
-    risk = min(100, risk)
+
+def _component_scores(student):
+    # Points per rule, in the same order as REASONS and the trigger bits
+    return (
+        _attendance_points(student["attendance_2w"]),
+        25 * bool(student["late_submissions"] >= 2),
+        _workload_points(student["workload_spike_pct"]),
+        25 * bool(student["missing_assignment"]),
+        _drop_points(student["attendance_drop"]),
+    )
+
+
+def compute_risk(student):
+    components = _component_scores(student)
+
+    risk = min(100, sum(components))
+    reasons = [REASONS[i] for i, points in enumerate(components) if points]
+    bits = sum(1 << i for i, points in enumerate(components) if points)
 
     level = (
         "Low" if risk <= 30 else
@@ -37,56 +63,45 @@ def compute_risk(student):
         "High"
     )
 
-    return risk, level, reasons
+    return risk, level, reasons, bits
 
 
 def anomaly_score(student):
-    score = 0
-    if student["attendance_drop"] > 25:
-        score += 1
-    if student["late_submissions"] >= 3:
-        score += 1
-    if student["workload_spike_pct"] > 50:
-        score += 1
-    if student["missing_assignment"]:
-        score += 1
-    return score
-
-
-def recommend(reasons):
-    recs = []
-    for r in reasons:
-        if "Attendance" in r:
-            recs.append("Schedule advisor check-in")
-        if "late" in r:
-            recs.append("Adopt weekly workload planning")
-        if "workload" in r:
-            recs.append("Rebalance academic schedule")
-        if "Missing" in r:
-            recs.append("Immediate academic follow-up")
-    return list(set(recs))
+    return (
+        bool(student["attendance_drop"] > 25) +
+        bool(student["late_submissions"] >= 3) +
+        bool(student["workload_spike_pct"] > 50) +
+        bool(student["missing_assignment"])
+    )
+
+
+def recommend(bits):
+    return [REC_MAP[b] for b in REC_MAP if bits & b]
+
+
+_rng = np.random.default_rng()
 
 
 def simulate_trend(base_risk):
-    trend = []
-    for _ in range(6):
-        base_risk += random.randint(-8, 12)
-        trend.append(max(0, min(100, base_risk)))
-    return trend
+    deltas = _rng.integers(-8, 13, size=6)
+    return np.clip(base_risk + deltas.cumsum(), 0, 100).tolist()
 
 
 def what_if_simulation(student, fix_attendance=False, fix_workload=False):
-    modified = student.copy()
+    # Only the attendance, drop and workload rules can change, so adjust
+    # the original total by their deltas instead of re-running every rule
+    attendance, late, workload, missing, drop = _component_scores(student)
+    total = attendance + late + workload + missing + drop
 
     if fix_attendance:
-        modified["attendance_2w"] = min(95, modified["attendance_2w"] + 20)
-        modified["attendance_drop"] = 0
+        total += _attendance_points(min(95, student["attendance_2w"] + 20)) - attendance
+        total += _drop_points(0) - drop
 
     if fix_workload:
-        modified["workload_spike_pct"] = 10
+        total += _workload_points(10) - workload
 
-    original_risk, _, _ = compute_risk(student)
-    new_risk, _, _ = compute_risk(modified)
+    original_risk = min(100, attendance + late + workload + missing + drop)
+    new_risk = min(100, total)
 
     return {
         "original_risk": original_risk,
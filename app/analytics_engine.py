@@ -12,34 +12,34 @@ This module runs ONCE at startup to compute all student analytics:
 NO live predictions. All results are precomputed and cached.
 """
 
-import pandas as pd
+from __future__ import annotations
+
 import numpy as np
-import pickle
+import orjson
+import json
 import os
-from typing import List, Dict, Any, Tuple, Optional
-from dataclasses import dataclass, asdict
+import threading
+from typing import TYPE_CHECKING, List, Dict, Any, Tuple, Optional
+from dataclasses import dataclass, asdict, fields
+from functools import lru_cache
+
+if TYPE_CHECKING:
+    # pandas is imported lazily in AnalyticsEngine._load to keep imports cheap
+    import pandas as pd
 
 
 # =============================================================================
 # DATA MODELS
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class ShapFeature:
     """Single feature contribution to prediction."""
     feature: str
     impact: float
 
 
-@dataclass
-class SilentCollapseRisk:
-    """Silent Academic Collapse detection result."""
-    level: str        # "Low", "Watch", "Elevated"
-    score: int        # 0-100
-    drivers: List[str]  # Explanatory factors
-
-
-@dataclass
+@dataclass(slots=True)
 class StudentAnalytics:
     """Complete analytics for a single student."""
     studentId: int
@@ -65,7 +65,7 @@ class StudentAnalytics:
     bullying: int
 
 
-@dataclass 
+@dataclass(slots=True)
 class AnalyticsStats:
     """Summary statistics for dashboard."""
     totalStudents: int
@@ -110,131 +110,134 @@ FEATURE_NAMES = {
 # SILENT COLLAPSE DETECTION
 # =============================================================================
 
-def compute_simulated_trend(row: pd.Series, final_score: int) -> List[int]:
+def _column(df: pd.DataFrame, name: str, default: int) -> np.ndarray:
+    """Get a column as an array, or a constant array if the column is absent."""
+    if name in df:
+        return df[name].to_numpy()
+    return np.full(len(df), default)
+
+
+def compute_simulated_trends(
+    df: pd.DataFrame,
+    final_scores: np.ndarray,
+    weeks: int = 8,
+    seed: int = 0
+) -> np.ndarray:
     """
-    Generate simulated stress trajectory based on current features.
+    Generate simulated stress trajectories for all students at once.
     
     In a real system, this would use historical data.
     Here we simulate based on risk factors to demonstrate the pattern.
+    
+    Returns:
+        (N, weeks) array of stress scores, one row per student
     """
-    # Base the trend on observable risk factors
-    np.random.seed(row.name if hasattr(row, 'name') else 0)
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(-5, 6, size=(len(df), weeks))
     
     # Factors that suggest rising stress
     rising_factors = (
-        (row.get('anxiety_level', 0) > 12) +
-        (row.get('depression', 0) > 15) +
-        (row.get('sleep_quality', 3) < 2) +
-        (row.get('study_load', 3) > 3)
+        (_column(df, 'anxiety_level', 0) > 12).astype(np.int64) +
+        (_column(df, 'depression', 0) > 15) +
+        (_column(df, 'sleep_quality', 3) < 2) +
+        (_column(df, 'study_load', 3) > 3)
     )
     
-    # Generate 8-week trajectory
-    trend = []
-    base = max(10, final_score - 25 - rising_factors * 5)
-    
-    for i in range(8):
-        # Add noise and trend direction
-        noise = np.random.randint(-5, 6)
-        if rising_factors >= 2:
-            # Rising pattern
-            progress = int((final_score - base) * (i / 7))
-            trend.append(min(100, max(0, base + progress + noise)))
-        else:
-            # Stable or slightly fluctuating
-            trend.append(min(100, max(0, final_score + noise)))
+    final = final_scores[:, None]
+    base = np.maximum(10, final - 25 - rising_factors[:, None] * 5)
+    
+    # Rising pattern: interpolate from base towards the current score
+    progress = np.trunc((final - base) * (np.arange(weeks) / (weeks - 1))).astype(np.int64)
+    rising = base + progress + noise
+    # Stable or slightly fluctuating around the current score
+    stable = final + noise
+    
+    trends = np.clip(np.where(rising_factors[:, None] >= 2, rising, stable), 0, 100)
     
     # Ensure last value is close to current score
-    trend[-1] = final_score
-    return trend
+    trends[:, -1] = final_scores
+    return trends
 
 
-def compute_stress_slope(trend: List[int]) -> float:
+def compute_stress_slopes(trends: np.ndarray) -> np.ndarray:
     """
-    Compute stress trajectory slope (trend direction).
+    Compute stress trajectory slope (trend direction) for each row.
     
     Returns: 
         Positive = rising stress, Negative = declining stress
         Normalized to roughly -1.0 to +1.0 range
     """
-    if len(trend) < 2:
-        return 0.0
+    n = trends.shape[1]
+    if n < 2:
+        return np.zeros(len(trends))
     
-    x = np.arange(len(trend))
-    y = np.array(trend)
+    x = np.arange(n)
     
     # Linear regression slope
-    n = len(x)
-    slope = (n * np.sum(x * y) - np.sum(x) * np.sum(y)) / (n * np.sum(x**2) - np.sum(x)**2)
+    slopes = (
+        (n * (trends * x).sum(axis=1) - x.sum() * trends.sum(axis=1))
+        / (n * (x**2).sum() - x.sum()**2)
+    )
     
     # Normalize: divide by range of possible scores
-    normalized = slope / 10  # ~10 points per week would be extreme
-    return round(float(np.clip(normalized, -1.0, 1.0)), 3)
+    normalized = slopes / 10  # ~10 points per week would be extreme
+    return np.round(np.clip(normalized, -1.0, 1.0), 3)
 
 
-def compute_stress_volatility(trend: List[int]) -> float:
+def compute_stress_volatilities(trends: np.ndarray) -> np.ndarray:
     """
-    Compute stress volatility (variance measure).
+    Compute stress volatility (variance measure) for each row.
     
     Returns:
         0.0 = stable, 1.0 = highly volatile
     """
-    if len(trend) < 2:
-        return 0.0
+    if trends.shape[1] < 2:
+        return np.zeros(len(trends))
     
     # Standard deviation, normalized by max possible (50)
-    std = np.std(trend)
-    volatility = min(1.0, std / 25)
-    return round(float(volatility), 3)
+    volatility = np.minimum(1.0, trends.std(axis=1) / 25)
+    return np.round(volatility, 3)
 
 
-def compute_persistence_score(trend: List[int], threshold: int = 40) -> int:
+def compute_persistence_scores(trends: np.ndarray, threshold: int = 40) -> np.ndarray:
     """
-    Count consecutive periods above stress threshold.
+    Count the longest run of consecutive periods above stress threshold.
     
     Returns:
-        Number of consecutive high-stress periods (0-8)
+        Number of consecutive high-stress periods (0-8) for each row
     """
-    consecutive = 0
-    max_consecutive = 0
+    consecutive = np.zeros(len(trends), dtype=np.int64)
+    max_consecutive = np.zeros(len(trends), dtype=np.int64)
     
-    for score in trend:
-        if score >= threshold:
-            consecutive += 1
-            max_consecutive = max(max_consecutive, consecutive)
-        else:
-            consecutive = 0
+    # Walk the (short) time axis; each step is vectorized across students
+    for above in (trends >= threshold).T:
+        consecutive = np.where(above, consecutive + 1, 0)
+        np.maximum(max_consecutive, consecutive, out=max_consecutive)
     
     return max_consecutive
 
 
-def compute_silent_collapse_risk(
-    row: pd.Series,
-    final_score: int,
-    final_level: str
-) -> SilentCollapseRisk:
+@lru_cache(maxsize=None)
+def _collapse_from_bands(
+    final_level: str,
+    slope_band: int,
+    volatility_band: int,
+    persistence: int,
+    academic_stable: bool,
+    score_at_least_40: bool
+) -> Tuple[str, int, Tuple[str, ...]]:
     """
-    Detect Silent Academic Collapse pattern.
+    Score the Silent Collapse pattern from thresholded inputs.
     
-    Criteria:
-    1) Stress level is Moderate or High
-    2) Stress trajectory shows sustained increase OR high volatility
-    3) Academic performance remains stable (not failing)
-    4) Risk signals persist across multiple periods
+    slope_band counts the slope thresholds exceeded (0.15, 0.2, 0.3) and
+    volatility_band the volatility thresholds exceeded (0.3, 0.5).
     
-    This captures students who are coping externally but declining internally.
+    Returns:
+        (level, collapse score 0-100, drivers)
     """
     drivers = []
     collapse_score = 0
     
-    # Generate trajectory for analysis
-    trend = compute_simulated_trend(row, final_score)
-    
-    # Compute trajectory metrics
-    slope = compute_stress_slope(trend)
-    volatility = compute_stress_volatility(trend)
-    persistence = compute_persistence_score(trend)
-    academic_perf = row.get('academic_performance', 3)
-    
     # --- Scoring Logic ---
     
     # Factor 1: Current stress level must be concerning
@@ -244,18 +247,18 @@ def compute_silent_collapse_risk(
             collapse_score += 10
     
     # Factor 2: Rising stress trajectory
-    if slope > 0.3:
+    if slope_band == 3:
         collapse_score += 25
         drivers.append("Sustained stress increase observed")
-    elif slope > 0.15:
+    elif slope_band >= 1:
         collapse_score += 15
         drivers.append("Gradual stress increase pattern")
     
     # Factor 3: High volatility (instability)
-    if volatility > 0.5:
+    if volatility_band == 2:
         collapse_score += 20
         drivers.append("Elevated stress variability")
-    elif volatility > 0.3:
+    elif volatility_band == 1:
         collapse_score += 10
         drivers.append("Moderate stress fluctuations")
     
@@ -269,12 +272,12 @@ def compute_silent_collapse_risk(
     
     # Factor 5: Academic stability despite stress ("hidden" pattern)
     # This is the KEY differentiator for silent collapse
-    if academic_perf >= 2 and final_score >= 40:
+    if academic_stable and score_at_least_40:
         collapse_score += 15
         drivers.append("Academic stability masking internal strain")
     
     # Factor 6: Combined risk amplification
-    if slope > 0.2 and persistence >= 3 and academic_perf >= 2:
+    if slope_band >= 2 and persistence >= 3 and academic_stable:
         collapse_score += 10
         drivers.append("Multi-period pattern warrants attention")
     
@@ -293,172 +296,291 @@ def compute_silent_collapse_risk(
     if not drivers and level != "Low":
         drivers = ["Pattern under observation"]
     
-    return SilentCollapseRisk(
-        level=level,
-        score=collapse_score,
-        drivers=drivers
-    )
+    return level, collapse_score, tuple(drivers)
 
 
-# =============================================================================
-# RULE-BASED RISK SCORING
-# =============================================================================
-
-def compute_rule_risk(row: pd.Series) -> Tuple[int, List[str]]:
+def compute_silent_collapse_batch(
+    academic_performance: np.ndarray,
+    final_scores: np.ndarray,
+    final_levels: np.ndarray,
+    slopes: np.ndarray,
+    volatilities: np.ndarray,
+    persistences: np.ndarray
+) -> Tuple[List[Dict[str, Any]], np.ndarray]:
     """
-    Compute rule-based risk score from student features.
+    Detect the Silent Academic Collapse pattern for every student at once.
+    
+    Criteria:
+    1) Stress level is Moderate or High
+    2) Stress trajectory shows sustained increase OR high volatility
+    3) Academic performance remains stable (not failing)
+    4) Risk signals persist across multiple periods
     
-    Rules are domain-expert defined thresholds based on
-    psychological research on academic stress factors.
+    This captures students who are coping externally but declining internally.
+    Inputs are reduced to their threshold bands as arrays, and each
+    distinct band combination is scored once by _collapse_from_bands.
     
     Returns:
-        (risk_score 0-100, list of triggered rule descriptions)
+        (per-student {level, score, drivers} dicts, ready for
+         StudentAnalytics.silentCollapseRisk; level codes into COLLAPSE_LEVELS)
     """
-    score = 0
-    triggers = []
+    keys = np.column_stack([
+        final_levels,
+        (slopes > 0.15).astype(np.int64) + (slopes > 0.2) + (slopes > 0.3),
+        (volatilities > 0.3).astype(np.int64) + (volatilities > 0.5),
+        persistences,
+        academic_performance >= 2,
+        final_scores >= 40,
+    ]).astype(np.int64)
+    unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+    
+    outcomes = [
+        _collapse_from_bands(
+            RISK_LEVELS[level], slope_band, volatility_band, persistence,
+            bool(academic_stable), bool(score_at_least_40)
+        )
+        for level, slope_band, volatility_band, persistence,
+            academic_stable, score_at_least_40 in unique_keys.tolist()
+    ]
+    outcome_codes = np.array(
+        [COLLAPSE_LEVELS.index(level) for level, _, _ in outcomes], dtype=np.int8
+    )
     
+    risks = [
+        {'level': level, 'score': score, 'drivers': list(drivers)}
+        for level, score, drivers in (outcomes[j] for j in inverse.ravel().tolist())
+    ]
+    return risks, outcome_codes[inverse.ravel()]
+
+
+# =============================================================================
+# RULE-BASED RISK SCORING
+# =============================================================================
+
+# Domain-expert thresholds based on psychological research on academic
+# stress factors: (column, comparison, threshold, points, trigger template)
+RISK_RULES = [
     # Rule 1: High Anxiety (>15 on 0-21 scale)
-    if row['anxiety_level'] > 15:
-        score += 20
-        triggers.append(f"High anxiety level ({row['anxiety_level']}/21)")
-    
+    ('anxiety_level', '>', 15, 20, "High anxiety level ({}/21)"),
     # Rule 2: Depression Risk (>18 on 0-27 scale)
-    if row['depression'] > 18:
-        score += 20
-        triggers.append(f"Elevated depression indicators ({row['depression']}/27)")
-    
+    ('depression', '>', 18, 20, "Elevated depression indicators ({}/27)"),
     # Rule 3: Poor Sleep Quality (<2 on 0-5 scale)
-    if row['sleep_quality'] < 2:
-        score += 15
-        triggers.append(f"Poor sleep quality ({row['sleep_quality']}/5)")
-    
+    ('sleep_quality', '<', 2, 15, "Poor sleep quality ({}/5)"),
     # Rule 4: Low Social Support (<2 on 1-3 scale)
-    if row['social_support'] < 2:
-        score += 15
-        triggers.append(f"Insufficient social support ({row['social_support']}/3)")
-    
+    ('social_support', '<', 2, 15, "Insufficient social support ({}/3)"),
     # Rule 5: High Peer Pressure (>3 on 1-5 scale)
-    if row['peer_pressure'] > 3:
-        score += 10
-        triggers.append(f"High peer pressure ({row['peer_pressure']}/5)")
-    
+    ('peer_pressure', '>', 3, 10, "High peer pressure ({}/5)"),
     # Rule 6: Academic Struggle (<2 on 0-5 scale)
-    if row['academic_performance'] < 2:
-        score += 15
-        triggers.append(f"Academic performance concerns ({row['academic_performance']}/5)")
-    
+    ('academic_performance', '<', 2, 15, "Academic performance concerns ({}/5)"),
     # Rule 7: Bullying Exposure (>3 on 0-5 scale)
-    if row['bullying'] > 3:
-        score += 20
-        triggers.append(f"Bullying exposure detected ({row['bullying']}/5)")
-    
+    ('bullying', '>', 3, 20, "Bullying exposure detected ({}/5)"),
     # Rule 8: High Study Load (>4 on 0-5 scale)
-    if row['study_load'] > 4:
-        score += 10
-        triggers.append(f"Excessive study load ({row['study_load']}/5)")
-    
+    ('study_load', '>', 4, 10, "Excessive study load ({}/5)"),
     # Rule 9: Mental Health History
-    if row['mental_health_history'] == 1:
-        score += 15
-        triggers.append("Previous mental health history")
+    ('mental_health_history', '==', 1, 15, "Previous mental health history"),
+]
+
+_RULE_COLUMNS = [rule[0] for rule in RISK_RULES]
+_RULE_OPS = np.array([('>', '<', '==').index(rule[1]) for rule in RISK_RULES], dtype=np.int8)
+_RULE_THRESHOLDS = np.array([rule[2] for rule in RISK_RULES], dtype=np.int16)
+_RULE_POINTS = np.array([rule[3] for rule in RISK_RULES], dtype=np.int16)
+
+
+def _rule_kernel_numpy(X, ops, thresholds, points, out_scores, out_flags):
+    """Evaluate all rules column by column with NumPy masks."""
+    out_scores[:] = 0
+    out_flags[:] = 0
+    for r in range(X.shape[1]):
+        values = X[:, r]
+        if ops[r] == 0:
+            mask = values > thresholds[r]
+        elif ops[r] == 1:
+            mask = values < thresholds[r]
+        else:
+            mask = values == thresholds[r]
+        out_scores += points[r] * mask
+        out_flags |= mask.astype(np.int32) << r
+    np.minimum(out_scores, 100, out=out_scores)
+
+
+@lru_cache(maxsize=None)
+def _trigger_text(rule: int, value: int) -> str:
+    """
+    Format a rule's trigger description once per (rule, value) pair.
+    
+    Scores are small bounded integers, so only a few dozen distinct
+    strings exist; students that fire the same rule with the same
+    value share one string object.
+    """
+    return RISK_RULES[rule][4].format(value)
+
+
+def compute_rule_risk_vectorized(df: pd.DataFrame) -> Tuple[np.ndarray, List[List[str]]]:
+    """
+    Compute rule-based risk scores for every student in one pass.
+    
+    Rules are evaluated over a contiguous (N, rules) integer array,
+    producing a score and a bitmask of fired rules per student; trigger
+    descriptions are only formatted for rows where a rule fired.
+    
+    Returns:
+        (risk_scores 0-100 as an array of length N,
+         per-student list of triggered rule descriptions)
+    """
+    X = np.ascontiguousarray(df[_RULE_COLUMNS].to_numpy(), dtype=np.int16)
+    scores = np.empty(len(X), dtype=np.int32)
+    flags = np.empty(len(X), dtype=np.int32)
+    _rule_kernel_numpy(X, _RULE_OPS, _RULE_THRESHOLDS, _RULE_POINTS, scores, flags)
     
-    # Cap at 100
-    score = min(100, score)
+    triggers: List[List[str]] = [[] for _ in range(len(X))]
+    for i in np.flatnonzero(flags):
+        remaining = int(flags[i])
+        while remaining:
+            bit = remaining & -remaining
+            r = bit.bit_length() - 1
+            triggers[i].append(_trigger_text(r, int(X[i, r])))
+            remaining ^= bit
     
-    return score, triggers
+    return scores, triggers
 
 
-def get_risk_level(score: int) -> str:
-    """Convert numeric score to risk level."""
-    if score >= 61:
-        return "High"
-    elif score >= 31:
-        return "Moderate"
-    return "Low"
+RISK_LEVELS = ("Low", "Moderate", "High")
+
+# Raw dataset fields copied onto each StudentAnalytics record
+STUDENT_PROFILE_COLUMNS = (
+    'anxiety_level', 'depression', 'sleep_quality', 'academic_performance',
+    'social_support', 'peer_pressure', 'study_load', 'bullying'
+)
+
+# ML prediction maps to: 0=15, 1=45, 2=80 (unknown classes count as Moderate)
+ML_SCORE_LUT = np.array([15, 45, 80], dtype=np.int8)
+ML_SCORE_DEFAULT = 45
+COLLAPSE_LEVELS = ("Low", "Watch", "Elevated")
+
+
+def get_risk_level_codes(scores: np.ndarray) -> np.ndarray:
+    """Convert numeric scores to risk level codes (indices into RISK_LEVELS)."""
+    return (scores >= 31).astype(np.int8) + (scores >= 61)
 
 
 # =============================================================================
 # SHAP-LIKE FEATURE IMPORTANCE (Simplified)
 # =============================================================================
 
-def compute_shap_explanation(row: pd.Series, prediction: int) -> List[Dict[str, Any]]:
+# Feature weights (derived from domain knowledge + model coefficients)
+SHAP_WEIGHTS = {
+    'anxiety_level': 0.15,
+    'depression': 0.15,
+    'sleep_quality': -0.10,  # Higher is better
+    'academic_performance': -0.08,  # Higher is better
+    'social_support': -0.08,  # Higher is better
+    'peer_pressure': 0.07,
+    'bullying': 0.10,
+    'study_load': 0.06,
+    'self_esteem': -0.08,  # Higher is better
+    'mental_health_history': 0.08,
+    'future_career_concerns': 0.05,
+    'living_conditions': -0.04,
+    'safety': -0.04,
+    'basic_needs': -0.04,
+    'teacher_student_relationship': -0.03,
+    'noise_level': 0.03,
+    'headache': 0.02,
+    'blood_pressure': 0.02,
+    'breathing_problem': 0.02,
+    'extracurricular_activities': -0.02
+}
+
+# Population means (approximate from dataset)
+SHAP_MEANS = {
+    'anxiety_level': 10.5,
+    'depression': 12.0,
+    'sleep_quality': 2.5,
+    'academic_performance': 2.5,
+    'social_support': 2.0,
+    'peer_pressure': 2.5,
+    'bullying': 2.5,
+    'study_load': 3.0,
+    'self_esteem': 17.0,
+    'mental_health_history': 0.5,
+    'future_career_concerns': 3.0,
+    'living_conditions': 2.5,
+    'safety': 2.5,
+    'basic_needs': 3.0,
+    'teacher_student_relationship': 2.5,
+    'noise_level': 2.5,
+    'headache': 2.5,
+    'blood_pressure': 2.0,
+    'breathing_problem': 2.5,
+    'extracurricular_activities': 2.5
+}
+
+# Display names in SHAP_WEIGHTS order, resolved once rather than per student
+SHAP_FEATURES = tuple(SHAP_WEIGHTS)
+SHAP_DISPLAY_NAMES = tuple(FEATURE_NAMES.get(f, f) for f in SHAP_FEATURES)
+
+# Weights and means as aligned read-only vectors. float64 is kept on purpose:
+# impacts are rounded to 3 places, and float32 would shift some of them
+_SHAP_WEIGHT_VEC = np.array([SHAP_WEIGHTS[f] for f in SHAP_FEATURES])
+_SHAP_MEAN_VEC = np.array([SHAP_MEANS.get(f, 0) for f in SHAP_FEATURES])
+_SHAP_WEIGHT_VEC.flags.writeable = False
+_SHAP_MEAN_VEC.flags.writeable = False
+
+
+def compute_shap_explanations(df: pd.DataFrame, top_k: int = 5) -> List[List[Dict[str, Any]]]:
     """
-    Compute simplified feature importance explanation.
+    Compute simplified feature importance explanations for all students.
     
     This uses coefficient-based attribution rather than full SHAP
     for speed and simplicity. Each feature's contribution is based
-    on its deviation from the population mean.
+    on its deviation from the population mean, computed as a single
+    (N, F) array operation over the whole dataset.
     
     Returns:
-        List of {feature: str, impact: float} sorted by |impact|
+        Per-student list of {feature: str, impact: float} sorted by |impact|
     """
-    # Feature weights (derived from domain knowledge + model coefficients)
-    weights = {
-        'anxiety_level': 0.15,
-        'depression': 0.15,
-        'sleep_quality': -0.10,  # Higher is better
-        'academic_performance': -0.08,  # Higher is better
-        'social_support': -0.08,  # Higher is better
-        'peer_pressure': 0.07,
-        'bullying': 0.10,
-        'study_load': 0.06,
-        'self_esteem': -0.08,  # Higher is better
-        'mental_health_history': 0.08,
-        'future_career_concerns': 0.05,
-        'living_conditions': -0.04,
-        'safety': -0.04,
-        'basic_needs': -0.04,
-        'teacher_student_relationship': -0.03,
-        'noise_level': 0.03,
-        'headache': 0.02,
-        'blood_pressure': 0.02,
-        'breathing_problem': 0.02,
-        'extracurricular_activities': -0.02
-    }
-    
-    # Population means (approximate from dataset)
-    means = {
-        'anxiety_level': 10.5,
-        'depression': 12.0,
-        'sleep_quality': 2.5,
-        'academic_performance': 2.5,
-        'social_support': 2.0,
-        'peer_pressure': 2.5,
-        'bullying': 2.5,
-        'study_load': 3.0,
-        'self_esteem': 17.0,
-        'mental_health_history': 0.5,
-        'future_career_concerns': 3.0,
-        'living_conditions': 2.5,
-        'safety': 2.5,
-        'basic_needs': 3.0,
-        'teacher_student_relationship': 2.5,
-        'noise_level': 2.5,
-        'headache': 2.5,
-        'blood_pressure': 2.0,
-        'breathing_problem': 2.5,
-        'extracurricular_activities': 2.5
-    }
-    
-    explanations = []
-    for feature, weight in weights.items():
-        if feature in row:
-            deviation = row[feature] - means.get(feature, 0)
-            impact = weight * deviation
-            explanations.append({
-                'feature': FEATURE_NAMES.get(feature, feature),
-                'impact': round(impact, 3)
-            })
-    
-    # Sort by absolute impact, return top 5
-    explanations.sort(key=lambda x: abs(x['impact']), reverse=True)
-    return explanations[:5]
+    present = [j for j, f in enumerate(SHAP_FEATURES) if f in df]
+    features = [SHAP_FEATURES[j] for j in present]
+    display_names = tuple(SHAP_DISPLAY_NAMES[j] for j in present)
+    weights_vec = _SHAP_WEIGHT_VEC[present]
+    means_vec = _SHAP_MEAN_VEC[present]
+    
+    impacts = np.round((df[features].to_numpy() - means_vec) * weights_vec, 3)
+    
+    # Rank by absolute impact with ties broken by feature order: |impact| is
+    # a whole number of thousandths after rounding, so pack it together with
+    # the reversed feature index into one unique integer key per cell
+    n_features = len(features)
+    rank_keys = (
+        np.rint(np.abs(impacts) * 1000).astype(np.int64) * n_features
+        + np.arange(n_features - 1, -1, -1)
+    )
+    if top_k < n_features:
+        # Select the top k per row in linear time, then order only those k
+        top = np.argpartition(-rank_keys, top_k - 1, axis=1)[:, :top_k]
+    else:
+        top = np.broadcast_to(np.arange(n_features), rank_keys.shape)
+    order = np.argsort(-np.take_along_axis(rank_keys, top, axis=1), axis=1)
+    top = np.take_along_axis(top, order, axis=1)[:, :top_k]
+    
+    return [
+        [{'feature': display_names[j], 'impact': float(row_impacts[j])} for j in row_top]
+        for row_impacts, row_top in zip(impacts, top)
+    ]
 
 
 # =============================================================================
 # ANALYTICS ENGINE
 # =============================================================================
 
+_STUDENT_FIELDS = tuple(f.name for f in fields(StudentAnalytics))
+
+
+def _dumps(payload: Any) -> bytes:
+    """Encode a payload as compact UTF-8 JSON."""
+    return orjson.dumps(payload)
+
+
 class AnalyticsEngine:
     """
     Singleton analytics engine that loads data and computes
@@ -468,19 +590,41 @@ class AnalyticsEngine:
     def __init__(self):
         self.students: List[StudentAnalytics] = []
         self.stats: AnalyticsStats = None
+        
+        # Column (SoA) views of the per-student results, used for aggregates
+        self.final_scores: np.ndarray = np.empty(0, dtype=np.int64)
+        self.final_levels: np.ndarray = np.empty(0, dtype=np.int8)
+        self.ml_confidences: np.ndarray = np.empty(0)
+        self.collapse_levels: np.ndarray = np.empty(0, dtype=np.int8)
+        
+        # Serialized payload, built once since analytics are immutable after load
+        self._all_payload: Dict[str, Any] = {'students': [], 'stats': {}}
+        self._all_payload_json: bytes = b'{"students":[],"stats":{}}'
+        self._by_id: Dict[int, StudentAnalytics] = {}
+        self._dict_by_id: Dict[int, Dict[str, Any]] = {}
+        
         self.model = None
         self.feature_order = None
         self._loaded = False
+        self._lock = threading.Lock()
     
     def load(self, data_path: str = None, model_path: str = None):
         """
         Load dataset and model, compute all analytics.
         
-        This runs ONCE at startup.
+        This runs ONCE at startup. Concurrent callers (e.g. several
+        workers warming up together) block until the first load finishes.
         """
         if self._loaded:
             return
         
+        with self._lock:
+            if self._loaded:
+                return
+            self._load(data_path, model_path)
+    
+    def _load(self, data_path: Optional[str], model_path: Optional[str]):
+        """Do the actual loading; callers must hold self._lock."""
         # Determine paths
         base_dir = os.path.dirname(os.path.abspath(__file__))
         if data_path is None:
@@ -488,24 +632,27 @@ class AnalyticsEngine:
         if model_path is None:
             model_path = os.path.join(base_dir, 'stress_model.pkl')
         
-        # Load dataset
+        import pandas as pd
+        
+        # Load dataset (every column is a small integer score, so int8 suffices)
         print(f"[Analytics] Loading dataset from {data_path}")
-        df = pd.read_csv(data_path)
+        dtypes = {column: 'int8' for column in [*FEATURE_NAMES, 'stress_level']}
+        df = pd.read_csv(data_path, dtype=dtypes)
         
-        # Load ML model
+        # Load ML model (joblib memory-maps the estimator's NumPy arrays)
         try:
-            with open(model_path, 'rb') as f:
-                self.model = pickle.load(f)
+            from joblib import load as joblib_load
+            self.model = joblib_load(model_path, mmap_mode='r')
             print(f"[Analytics] Loaded ML model from {model_path}")
         except Exception as e:
             print(f"[Analytics] Warning: Could not load model: {e}")
             self.model = None
         
         # Load feature order
-        feature_order_path = os.path.join(base_dir, 'feature_order.pkl')
+        feature_order_path = os.path.join(base_dir, 'feature_order.json')
         try:
-            with open(feature_order_path, 'rb') as f:
-                self.feature_order = pickle.load(f)
+            with open(feature_order_path) as f:
+                self.feature_order = json.load(f)
         except:
             # Use default column order (excluding target)
             self.feature_order = [c for c in df.columns if c != 'stress_level']
@@ -514,53 +661,129 @@ class AnalyticsEngine:
         print(f"[Analytics] Computing analytics for {len(df)} students...")
         self.students = []
         
-        for idx, row in df.iterrows():
-            analytics = self._compute_student_analytics(idx + 1, row)
+        ml_predictions, ml_confidences = self._predict_batch(df)
+        rule_scores, rule_triggers = compute_rule_risk_vectorized(df)
+        shap_explanations = compute_shap_explanations(df)
+        
+        # Fusion: Weighted average of ML score (via lookup table) and rule score
+        known = (ml_predictions >= 0) & (ml_predictions < len(ML_SCORE_LUT))
+        ml_scores = np.where(
+            known,
+            ML_SCORE_LUT[np.clip(ml_predictions, 0, len(ML_SCORE_LUT) - 1)],
+            ML_SCORE_DEFAULT
+        )
+        
+        # Weighted fusion: 60% ML + 40% Rules
+        final_scores = (0.6 * ml_scores + 0.4 * rule_scores).astype(np.int64)
+        final_levels = get_risk_level_codes(final_scores)
+        
+        # Simulated trajectories for Silent Collapse analysis
+        trends = compute_simulated_trends(df, final_scores)
+        slopes = compute_stress_slopes(trends)
+        volatilities = compute_stress_volatilities(trends)
+        persistences = compute_persistence_scores(trends)
+        collapse_risks, collapse_levels = compute_silent_collapse_batch(
+            _column(df, 'academic_performance', 3), final_scores, final_levels,
+            slopes, volatilities, persistences
+        )
+        
+        # The batch results are converted to Python lists once, so the loop
+        # below only zips aligned values; rows are plain dicts of the profile
+        # fields (no pd.Series indexing per student)
+        profile = df[[c for c in STUDENT_PROFILE_COLUMNS if c in df]]
+        rows = profile.to_dict('records') if len(profile.columns) else [{}] * len(df)
+        
+        per_student = zip(
+            rows,
+            ml_predictions.tolist(), ml_confidences.tolist(),
+            rule_scores.tolist(), rule_triggers, shap_explanations,
+            final_scores.tolist(), final_levels.tolist(), collapse_risks
+        )
+        for i, (row, prediction, confidence, rule_score, triggers, shap,
+                final_score, level, collapse_risk) in enumerate(per_student):
+            analytics = self._compute_student_analytics(
+                i + 1, row,
+                int(prediction), confidence,
+                rule_score, triggers, shap,
+                final_score, RISK_LEVELS[level],
+                collapse_risk
+            )
             self.students.append(analytics)
         
+        self.final_scores = final_scores
+        self.final_levels = final_levels
+        self.ml_confidences = np.round(ml_confidences, 3)
+        self.collapse_levels = collapse_levels
+        
         # Compute summary stats
         self._compute_stats()
         
+        # Nested values are already plain lists/dicts, so a shallow field
+        # copy is enough; asdict() would deep-copy every nested container
+        self._all_payload = {
+            'students': [
+                {name: getattr(s, name) for name in _STUDENT_FIELDS}
+                for s in self.students
+            ],
+            'stats': asdict(self.stats)
+        }
+        self._by_id = {s.studentId: s for s in self.students}
+        self._dict_by_id = {d['studentId']: d for d in self._all_payload['students']}
+        self._all_payload_json = _dumps(self._all_payload)
+        
         self._loaded = True
         print(f"[Analytics] Ready. {len(self.students)} students analyzed.")
         print(f"[Analytics] Silent Collapse: {self.stats.elevatedCollapseRisk} Elevated, {self.stats.watchCollapseRisk} Watch")
     
-    def _compute_student_analytics(self, student_id: int, row: pd.Series) -> StudentAnalytics:
-        """Compute all analytics for a single student."""
+    def _predict_batch(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run the ML model once over the whole dataset.
+        
+        Returns:
+            (predicted class per student, confidence per student)
+        """
+        # Ground truth from dataset is used when the model is unavailable
+        ground_truth = (
+            df['stress_level'].to_numpy() if 'stress_level' in df
+            else np.ones(len(df), dtype=np.int64)
+        )
         
-        # 1. ML Prediction
         if self.model is not None:
             try:
-                # Prepare features in correct order
-                features = row[self.feature_order].values.reshape(1, -1)
-                ml_prediction = int(self.model.predict(features)[0])
-                ml_proba = self.model.predict_proba(features)[0]
-                ml_confidence = float(max(ml_proba))
+                # Prepare features in correct order, already in the float32
+                # layout sklearn's tree traversal converts its input to
+                features = np.ascontiguousarray(
+                    df[self.feature_order].to_numpy(), dtype=np.float32
+                )
+                # predict() would traverse every tree again; derive it from the
+                # probabilities exactly as sklearn's classifiers do
+                probabilities = self.model.predict_proba(features)
+                predictions = self.model.classes_[probabilities.argmax(axis=1)]
+                confidences = probabilities.max(axis=1)
+                return predictions, confidences
             except Exception as e:
                 # Fallback to ground truth
-                ml_prediction = int(row.get('stress_level', 1))
-                ml_confidence = 0.7
-        else:
-            # Use ground truth from dataset
-            ml_prediction = int(row.get('stress_level', 1))
-            ml_confidence = 0.85
-        
-        # 2. Rule-based scoring
-        rule_score, rule_triggers = compute_rule_risk(row)
-        
-        # 3. SHAP explanation
-        shap_explanation = compute_shap_explanation(row, ml_prediction)
+                return ground_truth, np.full(len(df), 0.7)
         
-        # 4. Fusion: Weighted average
-        # ML prediction maps to: 0=15, 1=45, 2=80
-        ml_score = {0: 15, 1: 45, 2: 80}.get(ml_prediction, 45)
+        return ground_truth, np.full(len(df), 0.85)
+    
+    def _compute_student_analytics(
+        self,
+        student_id: int,
+        row: Dict[str, Any],
+        ml_prediction: int,
+        ml_confidence: float,
+        rule_score: int,
+        rule_triggers: List[str],
+        shap_explanation: List[Dict[str, Any]],
+        final_score: int,
+        final_level: str,
+        collapse_risk: Dict[str, Any]
+    ) -> StudentAnalytics:
+        """Assemble the analytics record for a single student."""
         
-        # Weighted fusion: 60% ML + 40% Rules
-        final_score = int(0.6 * ml_score + 0.4 * rule_score)
-        final_level = get_risk_level(final_score)
-        
-        # 5. Silent Collapse Detection
-        collapse_risk = compute_silent_collapse_risk(row, final_score, final_level)
+        # 1. ML prediction, 2. rule-based scoring, 3. SHAP explanation,
+        # 4. fusion and 5. Silent Collapse detection are batch-computed in load()
         
         return StudentAnalytics(
             studentId=student_id,
@@ -571,7 +794,7 @@ class AnalyticsEngine:
             ruleRiskScore=rule_score,
             ruleTriggers=rule_triggers,
             shapExplanation=shap_explanation,
-            silentCollapseRisk=asdict(collapse_risk),
+            silentCollapseRisk=collapse_risk,
             anxiety_level=int(row.get('anxiety_level', 0)),
             depression=int(row.get('depression', 0)),
             sleep_quality=int(row.get('sleep_quality', 3)),
@@ -588,15 +811,17 @@ class AnalyticsEngine:
             self.stats = AnalyticsStats(0, 0, 0, 0, 0.0, 0.0, 0, 0)
             return
         
-        high = sum(1 for s in self.students if s.finalRiskLevel == "High")
-        moderate = sum(1 for s in self.students if s.finalRiskLevel == "Moderate")
-        low = sum(1 for s in self.students if s.finalRiskLevel == "Low")
-        avg_score = sum(s.finalRiskScore for s in self.students) / len(self.students)
-        avg_conf = sum(s.mlConfidence for s in self.students) / len(self.students)
+        # One counting pass per coded array instead of one scan per level
+        low, moderate, high = np.bincount(
+            self.final_levels.astype(np.intp), minlength=len(RISK_LEVELS)
+        ).tolist()
+        avg_score = float(self.final_scores.mean())
+        avg_conf = float(self.ml_confidences.mean())
         
         # Silent Collapse stats
-        elevated_collapse = sum(1 for s in self.students if s.silentCollapseRisk['level'] == "Elevated")
-        watch_collapse = sum(1 for s in self.students if s.silentCollapseRisk['level'] == "Watch")
+        _, watch_collapse, elevated_collapse = np.bincount(
+            self.collapse_levels.astype(np.intp), minlength=len(COLLAPSE_LEVELS)
+        ).tolist()
         
         self.stats = AnalyticsStats(
             totalStudents=len(self.students),
@@ -610,19 +835,33 @@ class AnalyticsEngine:
         )
     
     def get_all_analytics(self) -> Dict[str, Any]:
-        """Get all students with stats."""
-        return {
-            'students': [asdict(s) for s in self.students],
-            'stats': asdict(self.stats) if self.stats else {}
-        }
+        """Get all students with stats (precomputed in load())."""
+        return self._all_payload
+    
+    def get_all_analytics_json(self) -> bytes:
+        """Get all students with stats as JSON bytes (encoded once in load())."""
+        return self._all_payload_json
     
     def get_student(self, student_id: int) -> StudentAnalytics:
         """Get single student by ID."""
-        for s in self.students:
-            if s.studentId == student_id:
-                return s
-        return None
+        return self._by_id.get(student_id)
+    
+    def get_student_dict(self, student_id: int) -> Optional[Dict[str, Any]]:
+        """Get single student by ID as a dict (serialized once in load())."""
+        return self._dict_by_id.get(student_id)
+
+
+# Global singleton, created on first access (PEP 562 module __getattr__)
+_engine: Optional[AnalyticsEngine] = None
+_engine_lock = threading.Lock()
 
 
-# Global singleton
-analytics_engine = AnalyticsEngine()
+def __getattr__(name: str) -> Any:
+    global _engine
+    if name == 'analytics_engine':
+        if _engine is None:
+            with _engine_lock:
+                if _engine is None:
+                    _engine = AnalyticsEngine()
+        return _engine
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
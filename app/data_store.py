@@ -10,12 +10,15 @@ This module handles:
 For production, this would be replaced with a proper database layer.
 """
 
-from typing import Dict, List, Optional
+from bisect import bisect_left, insort
+from collections import Counter, deque
+from itertools import islice
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 from risk_engine import (
     Student, 
     generate_students, 
-    compute_risk, 
+    evaluate_risk, 
     anomaly_score,
     get_risk_level,
     recommend,
@@ -31,11 +34,32 @@ class DataStore:
     risk scores for fast API responses.
     """
     
+    # Ingestion log capacity; older events are dropped as new ones arrive
+    MAX_LOG_EVENTS = 10000
+    
     def __init__(self):
         """Initialize the data store with simulated student data."""
         self._students: Dict[int, Student] = {}
         self._risk_cache: Dict[int, dict] = {}
-        self._ingestion_log: List[dict] = []  # Track ingested events
+        # Track ingested events; only the most recent MAX_LOG_EVENTS are kept
+        self._ingestion_log: Deque[dict] = deque(maxlen=self.MAX_LOG_EVENTS)
+        
+        # Running aggregates over _risk_cache, kept in step by _update_risk_entry
+        self._level_counts: Counter = Counter()
+        self._score_sum = 0
+        self._anomaly_sum_milli = 0  # anomaly scores are rounded to 3 places
+        
+        # Moderate/High students as (-riskScore, load order, studentId), kept
+        # sorted on every update; ties keep the order students were loaded in
+        self._load_order: Dict[int, int] = {}
+        self._at_risk_keys: List[Tuple[int, int, int]] = []
+        
+        # Sorted at-risk view, rebuilt lazily after any risk cache change
+        self._at_risk_view: Optional[List[dict]] = None
+        
+        # Bumped on every risk cache change so callers can cache derived views
+        self._version = 0
+        
         self._initialize_data()
     
     def _initialize_data(self):
@@ -44,8 +68,13 @@ class DataStore:
         
         students = generate_students(50)
         
-        for student in students:
-            self._add_student(student)
+        # Build the whole cache in one pass, then total the aggregates once
+        self._students = {s.student_id: s for s in students}
+        self._load_order = {sid: i for i, sid in enumerate(self._students)}
+        self._risk_cache = {s.student_id: self._build_risk_entry(s) for s in students}
+        for data in self._risk_cache.values():
+            self._track_stats(data, 1)
+        self._invalidate_views()
         
         print(f"✅ Data store initialized with {len(self._students)} students")
         self._print_summary()
@@ -53,6 +82,7 @@ class DataStore:
     def _add_student(self, student: Student):
         """Add a student and compute their risk profile."""
         self._students[student.student_id] = student
+        self._load_order.setdefault(student.student_id, len(self._load_order))
         self._refresh_risk_cache(student.student_id)
     
     def _refresh_risk_cache(self, student_id: int):
@@ -61,9 +91,24 @@ class DataStore:
         if not student:
             return
         
-        risk_score, reasons = compute_risk(student)
+        self._update_risk_entry(student)
+        self._invalidate_views()
+    
+    def _update_risk_entry(self, student: Student) -> dict:
+        """Recompute a student's cache entry and aggregates, without invalidating views."""
+        old = self._risk_cache.get(student.student_id)
+        if old is not None:
+            self._track_stats(old, -1)
+        
+        entry = self._risk_cache[student.student_id] = self._build_risk_entry(student)
+        self._track_stats(entry, 1)
+        return entry
+    
+    def _build_risk_entry(self, student: Student) -> dict:
+        """Compute the cached risk profile for a student."""
+        risk_score, reasons, flags = evaluate_risk(student)
         
-        self._risk_cache[student_id] = {
+        return {
             "studentId": student.student_id,
             "name": student.name,
             "email": student.email,
@@ -77,17 +122,38 @@ class DataStore:
             "riskLevel": get_risk_level(risk_score),
             "anomalyScore": anomaly_score(student),
             "triggeredRules": reasons,
-            "recommendations": recommend(reasons),
+            "recommendations": recommend(flags),
             "stressTrend": simulate_trend(risk_score)
         }
     
+    def _invalidate_views(self):
+        """Drop cached views after the risk cache changed."""
+        self._at_risk_view = None
+        self._version += 1
+    
+    @property
+    def version(self) -> int:
+        """Counter that changes whenever any student's risk data changes."""
+        return self._version
+    
+    def _track_stats(self, data: dict, sign: int):
+        """Add (sign=1) or remove (sign=-1) a cache entry from the running aggregates."""
+        self._level_counts[data["riskLevel"]] += sign
+        self._score_sum += sign * data["riskScore"]
+        self._anomaly_sum_milli += sign * round(data["anomalyScore"] * 1000)
+        
+        if data["riskLevel"] in ("Moderate", "High"):
+            key = (-data["riskScore"], self._load_order[data["studentId"]], data["studentId"])
+            if sign > 0:
+                insort(self._at_risk_keys, key)
+            else:
+                del self._at_risk_keys[bisect_left(self._at_risk_keys, key)]
+    
     def _print_summary(self):
         """Print summary of risk distribution."""
-        high = sum(1 for d in self._risk_cache.values() if d["riskLevel"] == "High")
-        moderate = sum(1 for d in self._risk_cache.values() if d["riskLevel"] == "Moderate")
-        low = sum(1 for d in self._risk_cache.values() if d["riskLevel"] == "Low")
+        counts = self._level_counts
         
-        print(f"   📊 Risk Distribution: High={high}, Moderate={moderate}, Low={low}")
+        print(f"   📊 Risk Distribution: High={counts['High']}, Moderate={counts['Moderate']}, Low={counts['Low']}")
     
     # =========================================================================
     # INGESTION METHODS (NEW)
@@ -113,31 +179,26 @@ class DataStore:
         if not student:
             return None
         
+        result = self._apply_attendance(student, attendance_rate)
+        self._invalidate_views()
+        return result
+    
+    def _apply_attendance(self, student: Student, attendance_rate: float) -> dict:
+        """Apply an attendance record; the caller invalidates views afterwards."""
+        student_id = student.student_id
+        
         # Store previous values for comparison
         old_attendance = student.attendance_rate
         old_cache = self._risk_cache.get(student_id, {})
         old_score = old_cache.get("riskScore", 0)
         
-        # Update the student record
+        # Update the student record in place
         # Move current attendance to previous for behavior change detection
-        student = Student(
-            student_id=student.student_id,
-            name=student.name,
-            email=student.email,
-            department=student.department,
-            year=student.year,
-            attendance_rate=attendance_rate,
-            late_submissions=student.late_submissions,
-            missed_submissions=student.missed_submissions,
-            workload_tasks=student.workload_tasks,
-            previous_attendance=old_attendance,
-            previous_workload=student.previous_workload
-        )
-        self._students[student_id] = student
+        student.attendance_rate = attendance_rate
+        student.previous_attendance = old_attendance
         
         # Recompute risk
-        self._refresh_risk_cache(student_id)
-        new_cache = self._risk_cache[student_id]
+        new_cache = self._update_risk_entry(student)
         
         # Log the ingestion event
         event = {
@@ -189,6 +250,14 @@ class DataStore:
         if not student:
             return None
         
+        result = self._apply_assignment(student, status, task_count_change)
+        self._invalidate_views()
+        return result
+    
+    def _apply_assignment(self, student: Student, status: str, task_count_change: int) -> dict:
+        """Apply an assignment event; the caller invalidates views afterwards."""
+        student_id = student.student_id
+        
         # Store previous values
         old_cache = self._risk_cache.get(student_id, {})
         old_score = old_cache.get("riskScore", 0)
@@ -206,25 +275,14 @@ class DataStore:
         elif status == "missing":
             new_missed = old_missed + 1
         
-        # Create updated student record
-        student = Student(
-            student_id=student.student_id,
-            name=student.name,
-            email=student.email,
-            department=student.department,
-            year=student.year,
-            attendance_rate=student.attendance_rate,
-            late_submissions=new_late,
-            missed_submissions=new_missed,
-            workload_tasks=new_workload,
-            previous_attendance=student.previous_attendance,
-            previous_workload=old_workload
-        )
-        self._students[student_id] = student
+        # Update the student record in place
+        student.late_submissions = new_late
+        student.missed_submissions = new_missed
+        student.workload_tasks = new_workload
+        student.previous_workload = old_workload
         
         # Recompute risk
-        self._refresh_risk_cache(student_id)
-        new_cache = self._risk_cache[student_id]
+        new_cache = self._update_risk_entry(student)
         
         # Log the ingestion event
         event = {
@@ -252,6 +310,53 @@ class DataStore:
             "triggeredRules": new_cache["triggeredRules"]
         }
     
+    def ingest_batch(self, events: List[dict]) -> Optional[List[dict]]:
+        """
+        Ingest several attendance/assignment events in one call.
+        
+        Used by: POST /ingest/batch
+        
+        Events are applied in order. An event with type "attendance" carries
+        "attendance_rate"; type "assignment" carries "status" and an optional
+        "task_count_change". Every event is checked before any is applied,
+        and cached views are invalidated once at the end.
+        
+        Args:
+            events: Event dicts, each with a "type" and a "student_id"
+        
+        Returns:
+            Per-event results in input order, or None (with nothing
+            applied) if any event names an unknown student
+        
+        Raises:
+            ValueError: (with nothing applied) if an event has an unknown
+                type, an out-of-range attendance rate or an unknown status
+        """
+        if any(event["student_id"] not in self._students for event in events):
+            return None
+        
+        for event in events:
+            if event["type"] == "attendance":
+                if not 0 <= event["attendance_rate"] <= 100:
+                    raise ValueError(f"Invalid attendance rate: {event['attendance_rate']}")
+            elif event["type"] == "assignment":
+                if event["status"] not in ("on_time", "late", "missing"):
+                    raise ValueError(f"Invalid submission status: {event['status']}")
+            else:
+                raise ValueError(f"Invalid event type: {event['type']}")
+        
+        results = []
+        for event in events:
+            student = self._students[event["student_id"]]
+            if event["type"] == "attendance":
+                results.append(self._apply_attendance(student, event["attendance_rate"]))
+            else:
+                results.append(self._apply_assignment(
+                    student, event["status"], event.get("task_count_change", 0)
+                ))
+        self._invalidate_views()
+        return results
+    
     def reset_data(self) -> dict:
         """
         Reset all data to fresh simulated state.
@@ -262,6 +367,10 @@ class DataStore:
         self._students.clear()
         self._risk_cache.clear()
         self._ingestion_log.clear()
+        self._level_counts.clear()
+        self._score_sum = 0
+        self._anomaly_sum_milli = 0
+        self._at_risk_keys.clear()
         self._initialize_data()
         
         return {
@@ -272,13 +381,21 @@ class DataStore:
         }
     
     def get_ingestion_log(self, limit: int = 50) -> List[dict]:
-        """Get recent ingestion events."""
-        return self._ingestion_log[-limit:][::-1]  # Most recent first
+        """Get up to `limit` recent ingestion events, most recent first (all if limit <= 0)."""
+        return list(islice(reversed(self._ingestion_log), limit if limit > 0 else None))
     
     # =========================================================================
     # PUBLIC API METHODS
     # =========================================================================
     
+    def count(self) -> int:
+        """
+        Number of students loaded.
+        
+        Used by: GET / (health check)
+        """
+        return len(self._risk_cache)
+    
     def get_all_students(self) -> List[dict]:
         """
         Get all students with basic risk info.
@@ -286,8 +403,19 @@ class DataStore:
         Used by: GET /students
         Frontend: Renders full student table
         """
-        return [
-            {
+        return list(self.iter_students())
+    
+    def iter_students(self) -> Iterator[dict]:
+        """
+        Yield basic risk info one student at a time.
+        
+        Used by: GET /students/stream
+        
+        Iterates over a snapshot of the cache entries, so an ingestion
+        or reset between yields cannot break the iteration.
+        """
+        for data in list(self._risk_cache.values()):
+            yield {
                 "studentId": data["studentId"],
                 "name": data["name"],
                 "email": data["email"],
@@ -297,8 +425,6 @@ class DataStore:
                 "riskLevel": data["riskLevel"],
                 "anomalyScore": data["anomalyScore"]
             }
-            for data in self._risk_cache.values()
-        ]
     
     def get_at_risk_students(self) -> List[dict]:
         """
@@ -306,8 +432,16 @@ class DataStore:
         
         Used by: GET /students/at-risk
         Frontend: Powers the main dashboard at-risk table
+        
+        The filtered, sorted view is cached until the next risk update.
         """
-        at_risk = [
+        if self._at_risk_view is None:
+            self._at_risk_view = self._build_at_risk_view()
+        return list(self._at_risk_view)
+    
+    def _build_at_risk_view(self) -> List[dict]:
+        """Materialize the sorted at-risk index (risk score DESC) as summaries."""
+        return [
             {
                 "studentId": data["studentId"],
                 "name": data["name"],
@@ -319,12 +453,8 @@ class DataStore:
                 "anomalyScore": data["anomalyScore"],
                 "flagCount": len(data["triggeredRules"])
             }
-            for data in self._risk_cache.values()
-            if data["riskLevel"] in ["Moderate", "High"]
+            for data in (self._risk_cache[sid] for _, _, sid in self._at_risk_keys)
         ]
-        
-        # Sort by risk score descending (highest risk first)
-        return sorted(at_risk, key=lambda x: x["riskScore"], reverse=True)
     
     def get_student_risk_detail(self, student_id: int) -> Optional[dict]:
         """
@@ -353,20 +483,21 @@ class DataStore:
         
         Used by: GET /students (stats section)
         Frontend: Powers the stats cards at top of dashboard
+        
+        Served from running aggregates, so this is O(1) regardless of
+        how many students or ingestion events there have been.
         """
-        all_data = list(self._risk_cache.values())
+        total = len(self._risk_cache)
+        counts = self._level_counts
         
         return {
-            "totalStudents": len(all_data),
-            "highRisk": sum(1 for d in all_data if d["riskLevel"] == "High"),
-            "moderateRisk": sum(1 for d in all_data if d["riskLevel"] == "Moderate"),
-            "lowRisk": sum(1 for d in all_data if d["riskLevel"] == "Low"),
-            "averageRisk": round(
-                sum(d["riskScore"] for d in all_data) / len(all_data) if all_data else 0, 
-                1
-            ),
+            "totalStudents": total,
+            "highRisk": counts["High"],
+            "moderateRisk": counts["Moderate"],
+            "lowRisk": counts["Low"],
+            "averageRisk": round(self._score_sum / total if total else 0, 1),
             "averageAnomaly": round(
-                sum(d["anomalyScore"] for d in all_data) / len(all_data) if all_data else 0,
+                self._anomaly_sum_milli / 1000 / total if total else 0,
                 3
             )
         }
@@ -9,30 +9,43 @@ Run with:
 
 Endpoints:
     GET  /students           - All students with basic risk info
+    GET  /students/stream    - Same rows as NDJSON, one student per line
     GET  /students/at-risk   - Moderate + High risk students (sorted)
     GET  /risk/{student_id}  - Full detail for one student
     POST /simulate/what-if   - What-if intervention simulation
     POST /ingest/attendance  - Ingest attendance data (NEW)
     POST /ingest/assignment  - Ingest assignment data (NEW)
+    POST /ingest/batch       - Ingest many events in one request
     POST /reset              - Reset data for demo (NEW)
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Optional, Literal
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import Annotated, Any, AsyncIterator, Callable, Dict, List, Optional, Literal, Tuple, Union
+import orjson
+import os
 import uvicorn
 
 # Import our modules
 from data_store import data_store
 from risk_engine import what_if_simulation
-from analytics_engine import analytics_engine
+import analytics_engine  # engine singleton is built on first attribute access
 
 
 # =============================================================================
 # PYDANTIC RESPONSE MODELS
 # =============================================================================
 
+# Closed value sets shared by the response models below. Declaring them
+# keeps the OpenAPI schema (and generated clients) precise without
+# changing what goes over the wire.
+RiskLevel = Literal["Low", "Moderate", "High"]
+RiskScore = Annotated[int, Field(ge=0, le=100)]
+AnomalyScore = Annotated[float, Field(ge=0.0, le=1.0)]
+
 class StudentSummary(BaseModel):
     """Basic student info for table display."""
     studentId: int
@@ -40,9 +53,9 @@ class StudentSummary(BaseModel):
     email: str
     department: str
     year: int
-    riskScore: int
-    riskLevel: str
-    anomalyScore: float
+    riskScore: RiskScore
+    riskLevel: RiskLevel
+    anomalyScore: AnomalyScore
 
 
 class AtRiskStudent(StudentSummary):
@@ -56,14 +69,14 @@ class Recommendation(BaseModel):
     icon: str
     title: str
     description: str
-    priority: str
+    priority: Literal["high", "medium", "low"]
 
 
 class TrendPoint(BaseModel):
     """Single point in stress trend timeline."""
     week: str
-    score: int
-    level: str
+    score: RiskScore
+    level: RiskLevel
 
 
 class StudentRiskDetail(BaseModel):
@@ -77,9 +90,9 @@ class StudentRiskDetail(BaseModel):
     lateSubmissions: int
     missedSubmissions: int
     workloadTasks: int
-    riskScore: int
-    riskLevel: str
-    anomalyScore: float
+    riskScore: RiskScore
+    riskLevel: RiskLevel
+    anomalyScore: AnomalyScore
     triggeredRules: List[str]
     recommendations: List[Recommendation]
     stressTrend: List[TrendPoint]
@@ -101,6 +114,12 @@ class AllStudentsResponse(BaseModel):
     stats: DashboardStats
 
 
+_ALL_STUDENTS_ADAPTER = TypeAdapter(AllStudentsResponse)
+_AT_RISK_ADAPTER = TypeAdapter(List[AtRiskStudent])
+_STATS_ADAPTER = TypeAdapter(DashboardStats)
+_DETAIL_ADAPTER = TypeAdapter(StudentRiskDetail)
+
+
 class WhatIfRequest(BaseModel):
     """Request body for what-if simulation."""
     student_id: int = Field(..., description="Student ID to simulate")
@@ -116,10 +135,10 @@ class WhatIfRequest(BaseModel):
 
 class WhatIfResponse(BaseModel):
     """Response for what-if simulation."""
-    originalRisk: int
-    originalLevel: str
-    newRisk: int
-    newLevel: str
+    originalRisk: RiskScore
+    originalLevel: RiskLevel
+    newRisk: RiskScore
+    newLevel: RiskLevel
     riskReduction: int
     reductionPercent: float
     explanation: str
@@ -153,9 +172,9 @@ class AttendanceIngestResponse(BaseModel):
     event: str
     previousAttendance: float
     newAttendance: float
-    previousRiskScore: int
-    newRiskScore: int
-    riskLevel: str
+    previousRiskScore: RiskScore
+    newRiskScore: RiskScore
+    riskLevel: RiskLevel
     riskChange: int
     triggeredRules: List[str]
 
@@ -193,13 +212,60 @@ class AssignmentIngestResponse(BaseModel):
     lateSubmissions: SubmissionChange
     missedSubmissions: SubmissionChange
     workloadTasks: SubmissionChange
-    previousRiskScore: int
-    newRiskScore: int
-    riskLevel: str
+    previousRiskScore: RiskScore
+    newRiskScore: RiskScore
+    riskLevel: RiskLevel
     riskChange: int
     triggeredRules: List[str]
 
 
+class BatchAttendanceEvent(AttendanceIngestRequest):
+    """Attendance record inside a batch, tagged with its event type."""
+    type: Literal["attendance"]
+
+
+class BatchAssignmentEvent(AssignmentIngestRequest):
+    """Assignment event inside a batch, tagged with its event type."""
+    type: Literal["assignment"]
+
+
+class BatchIngestRequest(BaseModel):
+    """
+    Request body for ingesting many events at once.
+    
+    Events are applied in order; each one is shaped like the body of
+    POST /ingest/attendance or POST /ingest/assignment, plus a "type"
+    field that selects which of the two it is validated as.
+    """
+    events: List[Annotated[
+        Union[BatchAttendanceEvent, BatchAssignmentEvent],
+        Field(discriminator="type")
+    ]] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Attendance and/or assignment events, applied in order"
+    )
+
+
+class BatchRiskChange(BaseModel):
+    """Risk movement caused by one event in a batch."""
+    studentId: int
+    event: str
+    previousRiskScore: RiskScore
+    newRiskScore: RiskScore
+    riskLevel: RiskLevel
+    riskChange: int
+
+
+class BatchIngestResponse(BaseModel):
+    """Response after batch ingestion."""
+    success: bool
+    processed: int
+    riskChanges: List[BatchRiskChange]
+    stats: DashboardStats
+
+
 class ResetResponse(BaseModel):
     """Response after data reset."""
     success: bool
@@ -220,7 +286,65 @@ class IngestionEvent(BaseModel):
 # FASTAPI APP SETUP
 # =============================================================================
 
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson."""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+# Serialized responses for read endpoints, keyed by path and tagged with the
+# data store version they were built from
+_response_cache: Dict[str, Tuple[int, bytes]] = {}
+
+
+def _cached_json(key: str, build: Callable[[], bytes]) -> Response:
+    """Serve JSON bytes rebuilt only when the data store has changed."""
+    version = data_store.version
+    cached = _response_cache.get(key)
+    if cached is None or cached[0] != version:
+        cached = (version, build())
+        _response_cache[key] = cached
+    return Response(content=cached[1], media_type="application/json")
+
+
+# Serialized /risk/{student_id} bodies, paired with the cache entry they were
+# encoded from. The data store replaces a student's entry whenever their
+# risk is recomputed, so an ingestion only invalidates that one student.
+_detail_cache: Dict[int, Tuple[dict, bytes]] = {}
+
+
+def _cached_detail(student_id: int, detail: dict) -> Response:
+    """Serve a student's detail JSON, re-encoding only after their entry changed."""
+    cached = _detail_cache.get(student_id)
+    if cached is None or cached[0] is not detail:
+        cached = (detail, _DETAIL_ADAPTER.dump_json(_DETAIL_ADAPTER.validate_python(detail)))
+        _detail_cache[student_id] = cached
+    return Response(content=cached[1], media_type="application/json")
+
+
+# Interactive docs and the OpenAPI schema are for development; set
+# APP_ENV=production to leave them unmounted
+PRODUCTION = os.getenv("APP_ENV", "development") == "production"
+
+# Browser origins allowed to call the API with credentials. Starlette would
+# echo back any requesting origin for "*" with credentials, so origins are
+# listed explicitly; set CORS_ORIGINS (comma-separated) for deployed frontends.
+DEFAULT_CORS_ORIGINS = (
+    "http://localhost:3000,"
+    "http://localhost:5173,"
+    "http://localhost:5174,"
+    "http://127.0.0.1:3000,"
+    "http://127.0.0.1:5173"
+)
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", DEFAULT_CORS_ORIGINS).split(",")
+    if origin.strip()
+]
+
 app = FastAPI(
+    default_response_class=FastJSONResponse,
     title="Academic Stress Early Warning System API",
     description="""
     Backend API for detecting and explaining student stress risk using rule-based intelligence.
@@ -240,24 +364,24 @@ app = FastAPI(
     - Attendance drop > 20% → +15 points
     """,
     version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc"
+    docs_url=None if PRODUCTION else "/docs",
+    redoc_url=None if PRODUCTION else "/redoc",
+    openapi_url=None if PRODUCTION else "/openapi.json"
 )
 
-# Enable CORS for frontend development
+# Compress list responses; the student tables repeat the same departments,
+# email domains and level strings on every row. Level 1 keeps polling cheap.
+# Added before CORS so it sits inside it and only sees the final body.
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=1)
+
+# Enable CORS for the configured frontend origins
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://localhost:5173",
-        "http://localhost:5174",
-        "http://127.0.0.1:3000",
-        "http://127.0.0.1:5173",
-        "*"
-    ],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"]
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type"],
+    max_age=86400  # Browsers reuse the preflight result for a day
 )
 
 
@@ -273,8 +397,8 @@ async def startup_event():
     This runs the ML + Rule fusion pipeline ONCE and caches results.
     """
     print("[Startup] Initializing analytics engine...")
-    analytics_engine.load()
-    print(f"[Startup] Analytics ready: {analytics_engine.stats.totalStudents} students analyzed")
+    analytics_engine.analytics_engine.load()
+    print(f"[Startup] Analytics ready: {analytics_engine.analytics_engine.stats.totalStudents} students analyzed")
 
 
 # =============================================================================
@@ -292,7 +416,7 @@ async def root():
         "status": "healthy",
         "service": "Academic Stress Early Warning System",
         "version": "1.0.0",
-        "studentsLoaded": len(data_store.get_all_students())
+        "studentsLoaded": data_store.count()
     }
 
 
@@ -319,7 +443,11 @@ async def get_student_analytics():
     - SHAP-based feature importance explanation
     - Summary statistics for dashboard cards
     """
-    return analytics_engine.get_all_analytics()
+    # The payload is encoded once at startup; skip per-request serialization
+    return Response(
+        content=analytics_engine.analytics_engine.get_all_analytics_json(),
+        media_type="application/json"
+    )
 
 
 @app.get(
@@ -334,11 +462,10 @@ async def get_student_analytics_by_id(student_id: int):
     **Use for:** Student detail pages showing full breakdown
     of ML prediction, rule triggers, and SHAP explanation.
     """
-    from dataclasses import asdict
-    student = analytics_engine.get_student(student_id)
+    student = analytics_engine.analytics_engine.get_student_dict(student_id)
     if not student:
         raise HTTPException(status_code=404, detail=f"Student {student_id} not found")
-    return asdict(student)
+    return student
 
 
 # =============================================================================
@@ -360,13 +487,36 @@ async def get_all_students():
     - Power the stats cards showing risk distribution
     - Enable search/filter across all students
     """
-    students = data_store.get_all_students()
-    stats = data_store.get_dashboard_stats()
+    # Plain dicts are validated once against the response model, and the
+    # encoded bytes are reused until the next ingestion or reset
+    return _cached_json("/students", lambda: _ALL_STUDENTS_ADAPTER.dump_json(
+        _ALL_STUDENTS_ADAPTER.validate_python({
+            "students": data_store.get_all_students(),
+            "stats": data_store.get_dashboard_stats()
+        })
+    ))
+
+
+@app.get(
+    "/students/stream",
+    tags=["Students"],
+    summary="Stream all students as NDJSON",
+    response_class=StreamingResponse
+)
+async def stream_students():
+    """
+    Streams the same student rows as GET /students, one JSON object per
+    line (`application/x-ndjson`). Stats are not included.
     
-    return AllStudentsResponse(
-        students=[StudentSummary(**s) for s in students],
-        stats=DashboardStats(**stats)
-    )
+    **Frontend Usage:**
+    - Start rendering large tables before the last row is encoded
+    - Clients parse each line independently instead of one large document
+    """
+    async def lines() -> AsyncIterator[bytes]:
+        for student in data_store.iter_students():
+            yield orjson.dumps(student) + b"\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @app.get(
@@ -383,8 +533,9 @@ async def get_at_risk_students():
     - Power the main dashboard "At-Risk Students" table
     - Highest risk students appear first for immediate attention
     """
-    at_risk = data_store.get_at_risk_students()
-    return [AtRiskStudent(**s) for s in at_risk]
+    return _cached_json("/students/at-risk", lambda: _AT_RISK_ADAPTER.dump_json(
+        _AT_RISK_ADAPTER.validate_python(data_store.get_at_risk_students())
+    ))
 
 
 @app.get(
@@ -410,7 +561,7 @@ async def get_student_risk_detail(student_id: int):
             detail=f"Student with ID {student_id} not found"
         )
     
-    return StudentRiskDetail(**detail)
+    return _cached_detail(student_id, detail)
 
 
 @app.get(
@@ -421,7 +572,9 @@ async def get_student_risk_detail(student_id: int):
 )
 async def get_dashboard_stats():
     """Returns summary statistics for dashboard cards."""
-    return DashboardStats(**data_store.get_dashboard_stats())
+    return _cached_json("/stats", lambda: _STATS_ADAPTER.dump_json(
+        _STATS_ADAPTER.validate_python(data_store.get_dashboard_stats())
+    ))
 
 
 # =============================================================================
@@ -467,7 +620,7 @@ async def ingest_attendance(request: AttendanceIngestRequest):
             detail=f"Student with ID {request.student_id} not found"
         )
     
-    return AttendanceIngestResponse(**result)
+    return result
 
 
 @app.post(
@@ -515,7 +668,56 @@ async def ingest_assignment(request: AssignmentIngestRequest):
             detail=f"Student with ID {request.student_id} not found"
         )
     
-    return AssignmentIngestResponse(**result)
+    return result
+
+
+@app.post(
+    "/ingest/batch",
+    response_model=BatchIngestResponse,
+    tags=["Data Ingestion"],
+    summary="Ingest many attendance/assignment events at once"
+)
+async def ingest_batch(request: BatchIngestRequest):
+    """
+    Apply a list of ingestion events in a single request.
+    
+    **Use Case:**
+    Backfills and bulk uploads, where one request per event would
+    repeat parsing, middleware and validation work for every record.
+    The batch is all-or-nothing: if any event names an unknown
+    student or fails validation, nothing is applied.
+    
+    **Example:**
+    ```json
+    {
+      "events": [
+        {"type": "attendance", "student_id": 1001, "attendance_rate": 72.5},
+        {"type": "assignment", "student_id": 1002, "status": "late", "task_count_change": 1}
+      ]
+    }
+    ```
+    """
+    try:
+        results = data_store.ingest_batch([event.model_dump() for event in request.events])
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    
+    if results is None:
+        missing = sorted({
+            event.student_id for event in request.events
+            if data_store.get_student(event.student_id) is None
+        })
+        raise HTTPException(
+            status_code=404,
+            detail=f"Students with IDs {missing} not found"
+        )
+    
+    return {
+        "success": True,
+        "processed": len(results),
+        "riskChanges": results,
+        "stats": data_store.get_dashboard_stats()
+    }
 
 
 # =============================================================================
@@ -555,7 +757,7 @@ async def simulate_what_if(request: WhatIfRequest):
         missed_subs_target=request.missed_subs_target
     )
     
-    return WhatIfResponse(**result)
+    return result
 
 
 # =============================================================================
@@ -581,13 +783,7 @@ async def reset_data():
     - "Reset Demo" button in admin panel
     - Clear all modifications and start fresh
     """
-    result = data_store.reset_data()
-    return ResetResponse(
-        success=result["success"],
-        message=result["message"],
-        studentsLoaded=result["studentsLoaded"],
-        stats=DashboardStats(**result["stats"])
-    )
+    return data_store.reset_data()
 
 
 @app.get(
@@ -603,9 +799,10 @@ async def get_ingestion_events(limit: int = 50):
     - Activity log panel
     - Real-time event feed
     """
+    events = data_store.get_ingestion_log(limit)
     return {
-        "events": data_store.get_ingestion_log(limit),
-        "count": len(data_store.get_ingestion_log(limit))
+        "events": events,
+        "count": len(events)
     }
 
 
@@ -618,10 +815,15 @@ if __name__ == "__main__":
     print("📍 API Docs: http://localhost:8000/docs")
     print("📍 Frontend: http://localhost:5173\n")
     
+    # "auto" picks uvloop/httptools from uvicorn[standard] where they are
+    # available (uvloop is not installed on Windows) and falls back otherwise.
+    # Stay on a single worker: the data store is in-process memory.
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
+        loop="auto",
+        http="auto",
         reload=True,
         log_level="info"
     )
@@ -12,6 +12,9 @@ DO NOT MODIFY THE RULE LOGIC - This is the single source of truth.
 """
 
 import random
+from functools import lru_cache
+from itertools import accumulate
+from math import lcm
 from typing import Dict, List, Tuple, Any
 from dataclasses import dataclass
 from datetime import datetime, timedelta
@@ -21,7 +24,7 @@ from datetime import datetime, timedelta
 # DATA MODELS
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class Student:
     """Represents a student with academic behavior metrics."""
     student_id: int
@@ -67,6 +70,30 @@ LAST_NAMES = [
     "Roberts", "Gomez", "Phillips", "Evans", "Turner", "Diaz", "Parker", "Cruz"
 ]
 
+# (name, email) for each position in the first/last name cycle
+_NAME_EMAILS = tuple(
+    (
+        f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[i % len(LAST_NAMES)]}",
+        f"{FIRST_NAMES[i % len(FIRST_NAMES)].lower()}.{LAST_NAMES[i % len(LAST_NAMES)].lower()[0]}@university.edu"
+    )
+    for i in range(lcm(len(FIRST_NAMES), len(LAST_NAMES)))
+)
+
+STUDENT_PROFILES = ("excellent", "good", "moderate", "struggling", "critical")
+_PROFILE_CUM_WEIGHTS = tuple(accumulate((0.15, 0.25, 0.30, 0.20, 0.10)))
+
+# Ranges each profile's metrics are drawn from:
+# (attendance, late subs, missed subs, workload,
+#  previous attendance offset, previous workload decrease)
+# Integer ranges with low == high are fixed values and are not drawn.
+_PROFILE_PARAMS = {
+    "excellent":  ((92, 100), (0, 0), (0, 0), (6, 10), (-2, 2), (0, 0)),
+    "good":       ((82, 94), (0, 1), (0, 0), (8, 12), (-5, 5), (0, 2)),
+    "moderate":   ((72, 85), (1, 3), (0, 1), (10, 15), (5, 15), (2, 5)),
+    "struggling": ((62, 78), (2, 5), (1, 2), (14, 20), (10, 20), (4, 8)),
+    "critical":   ((50, 68), (4, 8), (2, 4), (16, 25), (15, 30), (6, 12)),
+}
+
 
 def generate_students(n: int = 50) -> List[Student]:
     """
@@ -81,52 +108,23 @@ def generate_students(n: int = 50) -> List[Student]:
     
     for i in range(n):
         student_id = 1000 + i
-        first_name = FIRST_NAMES[i % len(FIRST_NAMES)]
-        last_name = LAST_NAMES[i % len(LAST_NAMES)]
-        name = f"{first_name} {last_name}"
-        email = f"{first_name.lower()}.{last_name.lower()[0]}@university.edu"
+        name, email = _NAME_EMAILS[i % len(_NAME_EMAILS)]
         
         # Determine student profile type (affects data generation)
-        profile = random.choices(
-            ["excellent", "good", "moderate", "struggling", "critical"],
-            weights=[0.15, 0.25, 0.30, 0.20, 0.10]
-        )[0]
+        profile = random.choices(STUDENT_PROFILES, cum_weights=_PROFILE_CUM_WEIGHTS)[0]
+        (
+            (att_lo, att_hi), (late_lo, late_hi), (missed_lo, missed_hi),
+            (workload_lo, workload_hi), (change_lo, change_hi), (decrease_lo, decrease_hi)
+        ) = _PROFILE_PARAMS[profile]
         
-        if profile == "excellent":
-            attendance = random.uniform(92, 100)
-            late_subs = 0
-            missed_subs = 0
-            workload = random.randint(6, 10)
-            prev_attendance = attendance + random.uniform(-2, 2)
-            prev_workload = workload
-        elif profile == "good":
-            attendance = random.uniform(82, 94)
-            late_subs = random.randint(0, 1)
-            missed_subs = 0
-            workload = random.randint(8, 12)
-            prev_attendance = attendance + random.uniform(-5, 5)
-            prev_workload = workload - random.randint(0, 2)
-        elif profile == "moderate":
-            attendance = random.uniform(72, 85)
-            late_subs = random.randint(1, 3)
-            missed_subs = random.randint(0, 1)
-            workload = random.randint(10, 15)
-            prev_attendance = attendance + random.uniform(5, 15)
-            prev_workload = workload - random.randint(2, 5)
-        elif profile == "struggling":
-            attendance = random.uniform(62, 78)
-            late_subs = random.randint(2, 5)
-            missed_subs = random.randint(1, 2)
-            workload = random.randint(14, 20)
-            prev_attendance = attendance + random.uniform(10, 20)
-            prev_workload = workload - random.randint(4, 8)
-        else:  # critical
-            attendance = random.uniform(50, 68)
-            late_subs = random.randint(4, 8)
-            missed_subs = random.randint(2, 4)
-            workload = random.randint(16, 25)
-            prev_attendance = attendance + random.uniform(15, 30)
-            prev_workload = workload - random.randint(6, 12)
+        attendance = random.uniform(att_lo, att_hi)
+        late_subs = late_lo if late_lo == late_hi else random.randint(late_lo, late_hi)
+        missed_subs = missed_lo if missed_lo == missed_hi else random.randint(missed_lo, missed_hi)
+        workload = random.randint(workload_lo, workload_hi)
+        prev_attendance = attendance + random.uniform(change_lo, change_hi)
+        prev_workload = workload - (
+            decrease_lo if decrease_lo == decrease_hi else random.randint(decrease_lo, decrease_hi)
+        )
         
         students.append(Student(
             student_id=student_id,
@@ -149,54 +147,128 @@ def generate_students(n: int = 50) -> List[Student]:
 # RULE-BASED RISK COMPUTATION
 # =============================================================================
 
-def compute_risk(student: Student) -> Tuple[int, List[str]]:
+# Bit set in the rule flags returned by _risk_core for each triggered rule
+RULE_LOW_ATTENDANCE = 1 << 0
+RULE_LATE_SUBMISSIONS = 1 << 1
+RULE_WORKLOAD_SPIKE = 1 << 2
+RULE_MISSED_SUBMISSIONS = 1 << 3
+RULE_ATTENDANCE_DROP = 1 << 4
+
+
+def _risk_core(
+    attendance: float,
+    late: int,
+    missed: int,
+    workload: int,
+    previous_workload: int,
+    previous_attendance: float
+) -> Tuple[int, List[str], int]:
     """
-    Compute risk score (0-100) based on academic behavior rules.
+    Evaluate the five risk rules on raw metrics.
     
-    RULES (DO NOT MODIFY):
-    - Rule 1: Attendance < 75% → +20 points
-    - Rule 2: ≥2 late submissions → +25 points
-    - Rule 3: Workload increase >40% → +15 points
-    - Rule 4: Any missed submission → +25 points
-    - Rule 5: Attendance drop >20% from previous → +15 points
+    This is the rule logic behind compute_risk(), on plain scalars so
+    callers can score hypothetical values without building a Student.
     
     Returns:
-        Tuple of (risk_score, list_of_triggered_rules)
+        Tuple of (risk_score, list_of_triggered_rules, rule_flags) where
+        rule_flags has a RULE_* bit set for every triggered rule
     """
     score = 0
+    flags = 0
     reasons = []
     
     # Rule 1: Attendance Drop
-    if student.attendance_rate < 75:
+    if attendance < 75:
         score += 20
-        reasons.append(f"Attendance below 75% (current: {student.attendance_rate}%)")
+        flags |= RULE_LOW_ATTENDANCE
+        reasons.append(f"Attendance below 75% (current: {attendance}%)")
     
     # Rule 2: Consecutive Late Submissions
-    if student.late_submissions >= 2:
+    if late >= 2:
         score += 25
-        reasons.append(f"Multiple late submissions ({student.late_submissions} assignments)")
+        flags |= RULE_LATE_SUBMISSIONS
+        reasons.append(f"Multiple late submissions ({late} assignments)")
     
     # Rule 3: Workload Spike
-    if student.previous_workload > 0:
-        workload_increase = ((student.workload_tasks - student.previous_workload) 
-                            / student.previous_workload) * 100
+    if previous_workload > 0:
+        workload_increase = ((workload - previous_workload) / previous_workload) * 100
         if workload_increase > 40:
             score += 15
+            flags |= RULE_WORKLOAD_SPIKE
             reasons.append(f"Workload increased by {workload_increase:.0f}%")
     
     # Rule 4: Missing Submissions
-    if student.missed_submissions > 0:
+    if missed > 0:
         score += 25
-        reasons.append(f"Missing {student.missed_submissions} assignment(s)")
+        flags |= RULE_MISSED_SUBMISSIONS
+        reasons.append(f"Missing {missed} assignment(s)")
     
     # Rule 5: Sudden Behavior Change
-    attendance_drop = student.previous_attendance - student.attendance_rate
+    attendance_drop = previous_attendance - attendance
     if attendance_drop > 20:
         score += 15
+        flags |= RULE_ATTENDANCE_DROP
         reasons.append(f"Sudden attendance drop ({attendance_drop:.0f}% decrease)")
     
     # Cap at 100
-    return min(100, score), reasons
+    return min(100, score), reasons, flags
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _what_if_risk(
+    attendance: float,
+    late: int,
+    missed: int,
+    workload: int,
+    previous_workload: int,
+    previous_attendance: float
+) -> Tuple[int, frozenset]:
+    """
+    Memoized (score, set of reasons) for what-if scoring.
+    
+    Keyed on the metric values themselves, so results never go stale when
+    a student's record changes. typed=True keeps 75 and 75.0 apart, as
+    they render differently in the reason text.
+    """
+    score, reasons, _ = _risk_core(
+        attendance, late, missed, workload, previous_workload, previous_attendance
+    )
+    return score, frozenset(reasons)
+
+
+def evaluate_risk(student: Student) -> Tuple[int, List[str], int]:
+    """
+    Compute risk like compute_risk(), also returning the RULE_* flags.
+    
+    Returns:
+        Tuple of (risk_score, list_of_triggered_rules, rule_flags)
+    """
+    return _risk_core(
+        student.attendance_rate,
+        student.late_submissions,
+        student.missed_submissions,
+        student.workload_tasks,
+        student.previous_workload,
+        student.previous_attendance
+    )
+
+
+def compute_risk(student: Student) -> Tuple[int, List[str]]:
+    """
+    Compute risk score (0-100) based on academic behavior rules.
+    
+    RULES (DO NOT MODIFY):
+    - Rule 1: Attendance < 75% → +20 points
+    - Rule 2: ≥2 late submissions → +25 points
+    - Rule 3: Workload increase >40% → +15 points
+    - Rule 4: Any missed submission → +25 points
+    - Rule 5: Attendance drop >20% from previous → +15 points
+    
+    Returns:
+        Tuple of (risk_score, list_of_triggered_rules)
+    """
+    score, reasons, _ = evaluate_risk(student)
+    return score, reasons
 
 
 def get_risk_level(score: int) -> str:
@@ -253,81 +325,80 @@ def anomaly_score(student: Student) -> float:
 # RECOMMENDATION ENGINE
 # =============================================================================
 
-def recommend(reasons: List[str]) -> List[Dict[str, str]]:
+REC_ATTENDANCE = {
+    "id": "REC_ATTENDANCE",
+    "icon": "👥",
+    "title": "Schedule Advisor Meeting",
+    "description": "Book a session with your academic advisor to discuss attendance patterns and identify any barriers to class participation.",
+    "priority": "high"
+}
+
+REC_DEADLINE = {
+    "id": "REC_DEADLINE",
+    "icon": "📅",
+    "title": "Deadline Management Workshop",
+    "description": "Attend a time management workshop or use a calendar system to track assignment due dates 48 hours in advance.",
+    "priority": "medium"
+}
+
+REC_WORKLOAD = {
+    "id": "REC_WORKLOAD",
+    "icon": "⚖️",
+    "title": "Workload Balancing",
+    "description": "Work with your advisor to evaluate current course load and consider redistributing tasks or dropping non-essential activities.",
+    "priority": "medium"
+}
+
+REC_RECOVERY = {
+    "id": "REC_RECOVERY",
+    "icon": "📚",
+    "title": "Academic Recovery Plan",
+    "description": "Contact your professors to discuss make-up options and create a catch-up plan for missed assignments.",
+    "priority": "high"
+}
+
+REC_CHECKIN = {
+    "id": "REC_CHECKIN",
+    "icon": "💬",
+    "title": "Wellness Check-In",
+    "description": "Consider visiting the campus counseling center to discuss any personal challenges affecting your academic performance.",
+    "priority": "high"
+}
+
+REC_MAINTAIN = {
+    "id": "REC_MAINTAIN",
+    "icon": "✅",
+    "title": "Keep Up the Good Work!",
+    "description": "You're doing well! Continue your current study habits and maintain your healthy academic balance.",
+    "priority": "low"
+}
+
+# Advice for each rule, in rule order
+_RULE_RECOMMENDATIONS = (
+    (RULE_LOW_ATTENDANCE, REC_ATTENDANCE),
+    (RULE_LATE_SUBMISSIONS, REC_DEADLINE),
+    (RULE_WORKLOAD_SPIKE, REC_WORKLOAD),
+    (RULE_MISSED_SUBMISSIONS, REC_RECOVERY),
+    (RULE_ATTENDANCE_DROP, REC_CHECKIN),
+)
+
+# Recommendations for every possible combination of rule flags; each rule
+# maps to exactly one card, so the lists are unique by construction
+_RECOMMENDATIONS_BY_FLAGS = tuple(
+    tuple(rec for bit, rec in _RULE_RECOMMENDATIONS if flags & bit) or (REC_MAINTAIN,)
+    for flags in range(1 << len(_RULE_RECOMMENDATIONS))
+)
+
+
+def recommend(flags: int) -> List[Dict[str, str]]:
     """
     Generate actionable recommendations based on triggered risk factors.
     
-    Maps each risk factor to specific, actionable advice.
+    Maps each triggered rule (the RULE_* flags from evaluate_risk) to
+    specific, actionable advice. The card dicts are shared module
+    constants and must not be modified by callers.
     """
-    recommendations = []
-    
-    for reason in reasons:
-        reason_lower = reason.lower()
-        
-        if "attendance" in reason_lower and "below" in reason_lower:
-            recommendations.append({
-                "id": "REC_ATTENDANCE",
-                "icon": "👥",
-                "title": "Schedule Advisor Meeting",
-                "description": "Book a session with your academic advisor to discuss attendance patterns and identify any barriers to class participation.",
-                "priority": "high"
-            })
-        
-        if "late submission" in reason_lower:
-            recommendations.append({
-                "id": "REC_DEADLINE",
-                "icon": "📅",
-                "title": "Deadline Management Workshop",
-                "description": "Attend a time management workshop or use a calendar system to track assignment due dates 48 hours in advance.",
-                "priority": "medium"
-            })
-        
-        if "workload" in reason_lower:
-            recommendations.append({
-                "id": "REC_WORKLOAD",
-                "icon": "⚖️",
-                "title": "Workload Balancing",
-                "description": "Work with your advisor to evaluate current course load and consider redistributing tasks or dropping non-essential activities.",
-                "priority": "medium"
-            })
-        
-        if "missing" in reason_lower:
-            recommendations.append({
-                "id": "REC_RECOVERY",
-                "icon": "📚",
-                "title": "Academic Recovery Plan",
-                "description": "Contact your professors to discuss make-up options and create a catch-up plan for missed assignments.",
-                "priority": "high"
-            })
-        
-        if "sudden" in reason_lower or "drop" in reason_lower:
-            recommendations.append({
-                "id": "REC_CHECKIN",
-                "icon": "💬",
-                "title": "Wellness Check-In",
-                "description": "Consider visiting the campus counseling center to discuss any personal challenges affecting your academic performance.",
-                "priority": "high"
-            })
-    
-    # Add general recommendation if no specific ones
-    if not recommendations:
-        recommendations.append({
-            "id": "REC_MAINTAIN",
-            "icon": "✅",
-            "title": "Keep Up the Good Work!",
-            "description": "You're doing well! Continue your current study habits and maintain your healthy academic balance.",
-            "priority": "low"
-        })
-    
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_recs = []
-    for rec in recommendations:
-        if rec["id"] not in seen:
-            seen.add(rec["id"])
-            unique_recs.append(rec)
-    
-    return unique_recs
+    return list(_RECOMMENDATIONS_BY_FLAGS[flags])
 
 
 # =============================================================================
@@ -379,14 +450,14 @@ def simulate_trend(base_risk: int, weeks: int = 8) -> List[Dict[str, Any]]:
 #    - Compute their current risk score using compute_risk()
 #    - Store which rules are currently triggered (e.g., "Attendance below 75%")
 #
-# 2. CREATE HYPOTHETICAL COPY (NEVER MUTATE ORIGINAL)
-#    - Create a new Student object with the hypothetical improvements:
+# 2. DERIVE HYPOTHETICAL METRICS (NEVER MUTATE ORIGINAL)
+#    - Work out the hypothetical values as plain locals:
 #      • If fix_attendance=True → set attendance_rate to 90%
 #      • If fix_workload=True → set workload_tasks to 10 (baseline)
 #    - The original student record is NEVER changed
 #
 # 3. RECOMPUTE RISK ON HYPOTHETICAL STATE
-#    - Run the SAME compute_risk() function on the modified copy
+#    - Run the SAME rule kernel (_risk_core) on the hypothetical values
 #    - This ensures deterministic, consistent scoring
 #    - Compare which rules are now triggered vs. before
 #
@@ -397,7 +468,7 @@ def simulate_trend(base_risk: int, weeks: int = 8) -> List[Dict[str, Any]]:
 #
 # KEY PROPERTIES:
 # • DETERMINISTIC: Same input always produces same output (no randomness)
-# • NON-MUTATING: Original data is never changed; we operate on copies
+# • NON-MUTATING: Original data is never changed; we only read from it
 # • EXPLAINABLE: Every point change is traceable to a specific rule
 # • FAST: Pure in-memory computation with no database queries (<1ms)
 #
@@ -423,7 +494,7 @@ def what_if_simulation(
     
     This is a PURE FUNCTION that:
     - Takes the current student state
-    - Creates a hypothetical modified copy
+    - Derives hypothetical metric values
     - Recomputes the risk score
     - Returns a detailed explanation of what changed
     """
@@ -431,10 +502,19 @@ def what_if_simulation(
     # ═══════════════════════════════════════════════════════════════════════
     # STEP 1: Calculate original risk score
     # ═══════════════════════════════════════════════════════════════════════
-    original_score, original_reasons = compute_risk(student)
+    # Slider drags re-simulate the same student repeatedly, so both sides
+    # are scored through a small cache keyed on the metric values
+    original_score, original_rule_set = _what_if_risk(
+        student.attendance_rate,
+        student.late_submissions,
+        student.missed_submissions,
+        student.workload_tasks,
+        student.previous_workload,
+        student.previous_attendance
+    )
     
     # ═══════════════════════════════════════════════════════════════════════
-    # STEP 2: Create hypothetical student copy with improvements
+    # STEP 2: Derive hypothetical metrics with improvements
     # ═══════════════════════════════════════════════════════════════════════
     
     # Determine hypothetical values (Target overrides binary fix)
@@ -447,25 +527,29 @@ def what_if_simulation(
     # IF the user is actively simulating an attendance change.
     hypo_prev_attendance = hypo_attendance if (attendance_target is not None or fix_attendance) else student.previous_attendance
     
-    # Create a NEW Student object (original is untouched)
-    modified_student = Student(
-        student_id=student.student_id,
-        name=student.name,
-        email=student.email,
-        department=student.department,
-        year=student.year,
-        attendance_rate=hypo_attendance,
-        late_submissions=hypo_late,
-        missed_submissions=hypo_missed,
-        workload_tasks=hypo_workload,
-        previous_attendance=hypo_prev_attendance,
-        previous_workload=student.previous_workload
-    )
-    
     # ═══════════════════════════════════════════════════════════════════════
     # STEP 3: Recompute risk on hypothetical state (DETERMINISTIC)
     # ═══════════════════════════════════════════════════════════════════════
-    new_score, new_reasons = compute_risk(modified_student)
+    simulating = (
+        fix_attendance or fix_workload
+        or attendance_target is not None or workload_target is not None
+        or late_subs_target is not None or missed_subs_target is not None
+    )
+    
+    if simulating:
+        # Scored straight from the hypothetical values; no Student copy is built
+        new_score, new_rule_set = _what_if_risk(
+            hypo_attendance,
+            hypo_late,
+            hypo_missed,
+            hypo_workload,
+            student.previous_workload,
+            hypo_prev_attendance
+        )
+    else:
+        # Nothing simulated (e.g. the simulator's initial render): the
+        # hypothetical state is the original one
+        new_score, new_rule_set = original_score, original_rule_set
     
     # ═══════════════════════════════════════════════════════════════════════
     # STEP 4: Generate detailed natural language explanation
@@ -473,8 +557,6 @@ def what_if_simulation(
     explanations = []
     
     # Identify which rules were REMOVED or ADDED by the intervention
-    original_rule_set = set(original_reasons)
-    new_rule_set = set(new_reasons)
     removed_rules = original_rule_set - new_rule_set
     added_rules = new_rule_set - original_rule_set
     
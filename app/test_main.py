@@ -0,0 +1,62 @@
+"""
+API tests for the batch ingestion endpoint.
+
+Run from the app directory:
+    python -m unittest test_main
+"""
+
+import unittest
+
+from fastapi.testclient import TestClient
+
+from data_store import data_store
+from main import app
+
+
+class BatchIngestTests(unittest.TestCase):
+    """POST /ingest/batch validation and all-or-nothing behavior."""
+
+    def setUp(self):
+        data_store.reset_data()
+        self.client = TestClient(app)
+        self.student_id = next(iter(data_store.iter_students()))["studentId"]
+
+    def test_invalid_attendance_event_is_rejected(self):
+        """An out-of-range attendance event must not validate as an assignment."""
+        version = data_store.version
+        response = self.client.post("/ingest/batch", json={
+            "events": [
+                {"type": "attendance", "student_id": self.student_id,
+                 "attendance_rate": 150, "status": "late"}
+            ]
+        })
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(data_store.version, version)
+
+    def test_untagged_event_is_rejected(self):
+        response = self.client.post("/ingest/batch", json={
+            "events": [
+                {"student_id": self.student_id, "attendance_rate": 150, "status": "late"}
+            ]
+        })
+        self.assertEqual(response.status_code, 422)
+
+    def test_batch_applies_events_in_order(self):
+        response = self.client.post("/ingest/batch", json={
+            "events": [
+                {"type": "attendance", "student_id": self.student_id, "attendance_rate": 60},
+                {"type": "assignment", "student_id": self.student_id, "status": "late"}
+            ]
+        })
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["processed"], 2)
+        self.assertEqual(
+            [change["event"] for change in body["riskChanges"]],
+            ["attendance_updated", "assignment_recorded"]
+        )
+        self.assertEqual(data_store.get_student(self.student_id).attendance_rate, 60)
+
+
+if __name__ == "__main__":
+    unittest.main()